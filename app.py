@@ -45,6 +45,11 @@ def create_app() -> Flask:
 
     register_routes(app, db)
 
+    # import register_commands here to avoid circular imports
+    from build import register_commands
+
+    register_commands(app)
+
     migrate: Migrate = Migrate(app, db)  # noqa: F841
 
     return app
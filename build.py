@@ -0,0 +1,346 @@
+"""
+This file defines the `flask glossary build` command, which precomputes
+the read surface of the glossary into a directory of static files.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import click
+from flask import Flask, render_template
+from flask.cli import AppGroup
+from markupsafe import Markup, escape
+
+from models import Term
+
+# Name of the file recording what the previous build wrote
+MANIFEST_NAME: str = ".build-manifest.json"
+
+# Name of the file recording what the current build wrote, until its manifest is
+JOURNAL_NAME: str = ".build-journal"
+
+# Directory of the files being written, before they are renamed into place
+TMP_DIR_NAME: str = ".tmp"
+
+# Longest substring with its own search shard; longer searches use trigrams
+SEARCH_KEY_SIZE: int = 3
+
+# Fields for which a facet file is generated
+FACET_FIELDS: List[str] = ["domain_en", "domain_fr", "subdomains_en", "subdomains_fr"]
+
+# Pages of the site, by the path that serves them at their URL on a static server
+PAGES: Dict[str, str] = {
+    "index.html": "index.html",
+    "contact/index.html": "contact.html",
+    "glossary/index.html": "glossary.html",
+    "404.html": "404.html",
+}
+
+# Templates whose content is baked into every term page
+TERM_TEMPLATES: List[str] = ["base.html", "term.html"]
+
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# Inline tags used in the glossary data, mirroring `formater` in searchTerm.js
+MARKUP_TAGS: Dict[str, Tuple[str, str]] = {
+    "em": ("<em>", "</em>"),
+    "sub": ("<sub>", "</sub>"),
+    "b": ("<strong>", "</strong>"),
+    "u": ('<span class="underline">', "</span>"),
+    "ms": ('<span class="font-mono">', "</span>"),
+    "lt": ('<span class="line-through">', "</span>"),
+}
+
+# Field holding the term in each language
+TERM_FIELDS: Dict[str, str] = {"en": "english_term", "fr": "french_term"}
+
+
+def format_markup(text: Optional[str]) -> Markup:
+    """
+    Converts the inline tags of a glossary field to HTML, escaping everything else.
+
+    Input:  (str) text  | the raw field value
+    Output: (Markup)    | the HTML safe to insert in a template
+    """
+    html = str(escape(text or ""))
+    for tag, (opening, closing) in MARKUP_TAGS.items():
+        html = re.sub(
+            f"&lt;{tag}&gt;(.*?)&lt;/{tag}&gt;", f"{opening}\\1{closing}", html
+        )
+    return Markup(html)
+
+
+def strip_tags(text: Optional[str]) -> str:
+    """
+    Removes the inline tags of a glossary field, for places that only take plain text.
+
+    Input:  (str) text  | the raw field value
+    Output: (str)       | the text without inline tags, trimmed
+    """
+    return TAG_PATTERN.sub("", text or "").strip()
+
+
+def normalize(text: Optional[str]) -> str:
+    """
+    Normalizes a term for indexing, the same way searchTerm.js does for queries.
+
+    Input:  (str) text  | the raw term
+    Output: (str)       | the term without inline tags, trimmed and lowercased
+    """
+    return strip_tags(text).lower()
+
+
+def substrings(text: str) -> Set[str]:
+    """
+    Returns the set of 1, 2 & 3-character substrings of a normalized term.
+    Longer searches are matched through the trigrams they contain.
+
+    Input:  (str) text  | the normalized term
+    Output: (set)       | its substrings of up to 3 characters
+    """
+    return {
+        text[i : i + size]
+        for size in range(1, SEARCH_KEY_SIZE + 1)
+        for i in range(len(text) - size + 1)
+    }
+
+
+def shard_name(key: str) -> str:
+    """
+    Returns the file name of an index shard, safe on any file system or CDN.
+    Clients compute it as the hex of the UTF-8 bytes of the key.
+
+    Input:  (str) key   | a substring or prefix
+    Output: (str)       | the file name of the shard
+    """
+    return key.encode("utf-8").hex() + ".json"
+
+
+def dump_json(data: Any) -> bytes:
+    """
+    Serializes data the same way for every build, so unchanged files stay identical.
+
+    Input:  data    | any JSON serializable object
+    Output: (bytes) | the encoded JSON document
+    """
+    return json.dumps(
+        data, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def digest(content: bytes) -> str:
+    """
+    Returns the digest used to detect changed files.
+
+    Input:  (bytes) content | the content of a file
+    Output: (str)           | its SHA-256 hex digest
+    """
+    return hashlib.sha256(content).hexdigest()
+
+
+def write_atomic(path: str, content: bytes, tmp_dir: str) -> None:
+    """
+    Writes a file through a temporary file and a rename,
+    so a file server never reads a partial file.
+
+    Input:  (str) path      | the path of the file
+            (bytes) content | the content to write
+            (str) tmp_dir   | the directory of the temporary file, on the same file system
+    Output: Nothing
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    with os.fdopen(fd, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def build_glossary(app: Flask, output: str, full: bool = False) -> Dict[str, int]:
+    """
+    Precomputes the read surface of the glossary into `output`:
+
+        index.html                  the landing page
+        contact/index.html          the contact page
+        glossary/index.html         the glossary page
+        404.html                    the page for missing files
+        terms.json                  every term ID with its English & French terms
+        terms/<tid>.json            a term, as returned by GET /api/terms/<tid>
+        terms/<tid>.html            a term, rendered with term.html
+        search/<shard>.json         term IDs by 1, 2 & 3-character substring
+        autocomplete/<shard>.json   [term, tid, lang] by 1 & 2-character prefix
+        facets/<field>.json         term IDs by domain or subdomain
+        css/, img/, js/             the static assets of the app
+
+    Only files whose content changed since the previous build are rewritten,
+    and files that are no longer produced are removed. Term files are skipped
+    without rendering when neither the term nor its templates changed.
+
+    Input:  (Flask) app     | the application, for its templates & static files
+            (str) output    | the directory to build into
+            (bool) full     | rewrite every file, even if unchanged
+    Output: (dict)          | the number of terms and of written, unchanged & removed files
+    """
+    manifest_path = os.path.join(output, MANIFEST_NAME)
+    previous: Dict[str, str] = {}
+    # Loaded even for a full build, so its files no longer produced are removed
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    # A build that crashed left the files it wrote in its journal: an empty
+    # digest gets them rewritten if still produced, and removed otherwise
+    journal_path = os.path.join(output, JOURNAL_NAME)
+    if os.path.exists(journal_path):
+        with open(journal_path, encoding="utf-8") as f:
+            previous.update({relpath: "" for relpath in f.read().splitlines()})
+    current: Dict[str, str] = {}
+
+    # Remove the temporary files left by a build that crashed
+    tmp_dir = os.path.join(output, TMP_DIR_NAME)
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    stats: Dict[str, int] = {"terms": 0, "written": 0, "unchanged": 0, "removed": 0}
+
+    def is_fresh(relpath: str, key: str) -> bool:
+        current[relpath] = key
+        if not full and previous.get(relpath) == key and os.path.exists(
+            os.path.join(output, relpath)
+        ):
+            stats["unchanged"] += 1
+            return True
+        return False
+
+    def write(relpath: str, content: bytes, checked: bool = False) -> None:
+        # Callers that skip rendering unchanged files check freshness themselves
+        if not checked and is_fresh(relpath, digest(content)):
+            return
+        # Journaled first, so the file is tracked even if the build crashes
+        journal.write(relpath + "\n")
+        journal.flush()
+        write_atomic(os.path.join(output, relpath), content, tmp_dir)
+        stats["written"] += 1
+
+    templates = b"".join(
+        app.jinja_env.loader.get_source(app.jinja_env, name)[0].encode("utf-8")
+        for name in TERM_TEMPLATES
+    )
+    search: Dict[str, Set[int]] = {}
+    autocomplete: Dict[str, List[Tuple[str, List[Any]]]] = {}
+    facets: Dict[str, Dict[str, List[int]]] = {field: {} for field in FACET_FIELDS}
+    listing: List[List[Any]] = []
+
+    os.makedirs(output, exist_ok=True)
+    with app.test_request_context(), open(
+        journal_path, "a", encoding="utf-8"
+    ) as journal:
+        for term in Term.query.order_by(Term.tid).yield_per(1000):
+            data: Dict[str, Any] = term.to_dict()
+            tid: int = data["tid"]
+            stats["terms"] += 1
+
+            content = dump_json(data)
+            write(f"terms/{tid}.json", content)
+            key = digest(content + templates)
+            if not is_fresh(f"terms/{tid}.html", key):
+                html = render_template(
+                    "term.html", term=data, markup=format_markup, plain=strip_tags
+                )
+                write(f"terms/{tid}.html", html.encode("utf-8"), checked=True)
+
+            listing.append([tid, data["english_term"], data["french_term"]])
+            for lang, field in TERM_FIELDS.items():
+                if not isinstance(data[field], str):
+                    continue
+                text = normalize(data[field])
+                for substring in substrings(text):
+                    search.setdefault(substring, set()).add(tid)
+                for prefix in {text[:1], text[:2]} - {""}:
+                    autocomplete.setdefault(prefix, []).append(
+                        (text, [data[field], tid, lang])
+                    )
+
+            for field in FACET_FIELDS:
+                values = data[field] or []
+                for value in values if isinstance(values, list) else [values]:
+                    # JSON fields are not validated, so skip anything but text
+                    if value and isinstance(value, str):
+                        facets[field].setdefault(value, []).append(tid)
+
+        for relpath, template in PAGES.items():
+            # Make searchTerm.js query the files below instead of the API
+            html = render_template(template, static_index="/")
+            write(relpath, html.encode("utf-8"))
+
+        write("terms.json", dump_json(listing))
+        for key, tids in search.items():
+            write(f"search/{shard_name(key)}", dump_json(sorted(tids)))
+        for prefix, entries in autocomplete.items():
+            entries.sort(key=lambda entry: entry[0])
+            write(
+                f"autocomplete/{shard_name(prefix)}",
+                dump_json([entry for _, entry in entries]),
+            )
+        for field, values in facets.items():
+            write(f"facets/{field}.json", dump_json(values))
+
+        for root, _, files in os.walk(app.static_folder):
+            for name in files:
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    write(os.path.relpath(path, app.static_folder), f.read())
+
+    # Remove the files of the previous build that are no longer produced
+    for relpath in previous.keys() - current.keys():
+        path = os.path.join(output, relpath)
+        if os.path.exists(path):
+            os.remove(path)
+            stats["removed"] += 1
+
+    write_atomic(manifest_path, dump_json(current), tmp_dir)
+    os.remove(journal_path)
+
+    return stats
+
+
+def register_commands(app: Flask) -> None:
+    """
+    Define and register the `flask glossary` commands of the application.
+    """
+    glossary_cli: AppGroup = AppGroup("glossary", help="Manage the glossary.")
+
+    @glossary_cli.command("build")
+    @click.option(
+        "--output",
+        "-o",
+        type=click.Path(file_okay=False),
+        default=None,
+        help="Directory to build into (default: build/ next to app.py).",
+    )
+    @click.option(
+        "--full", is_flag=True, help="Rewrite every file, even if unchanged."
+    )
+    def build(output: Optional[str], full: bool) -> None:
+        """
+        Precompute the glossary into static files, servable without the app.
+        """
+        output = output or os.path.join(app.root_path, "build")
+
+        start = time.perf_counter()
+        stats = build_glossary(app, output, full=full)
+        elapsed = time.perf_counter() - start
+
+        click.echo(
+            f"Built {stats['terms']} terms into {output} in {elapsed:.2f}s: "
+            f"{stats['written']} files written, {stats['unchanged']} unchanged, "
+            f"{stats['removed']} removed."
+        )
+
+    app.cli.add_command(glossary_cli)
@@ -0,0 +1,75 @@
+"""
+This file defines the fixtures shared by the tests.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterator
+
+import pytest
+from flask import Flask, render_template
+
+from app import db
+from build import register_commands
+from models import Term
+
+
+@pytest.fixture
+def app(tmp_path) -> Iterator[Flask]:
+    """
+    Create a Flask app on a temporary database, holding two terms.
+
+    The routes are not registered through `register_routes`, whose Flask-Admin
+    setup is not needed here; only the pages the templates link to are.
+    """
+    app: Flask = Flask(
+        "app",
+        root_path=os.path.dirname(os.path.abspath(__file__)),
+        template_folder="templates",
+        static_folder="static",
+        static_url_path="/",
+    )
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'glossary.db'}"
+    app.config["TESTING"] = True
+
+    db.init_app(app)
+    register_commands(app)
+
+    for endpoint, template in [
+        ("index", "index.html"),
+        ("contact", "contact.html"),
+        ("glossary", "glossary.html"),
+    ]:
+        app.add_url_rule(
+            "/" if endpoint == "index" else f"/{endpoint}",
+            endpoint,
+            lambda template=template: render_template(template),
+        )
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(
+            [
+                Term(
+                    domain_en="Big Data",
+                    domain_fr="Mégadonnées",
+                    subdomains_en=["Storage", None],
+                    subdomains_fr=["Stockage"],
+                    english_term="<em>Big</em> data",
+                    french_term="Données massives",
+                    definition_en="Data too <b>large</b> for a single machine.",
+                ),
+                Term(
+                    domain_en="Blockchain",
+                    domain_fr="Chaîne de blocs",
+                    subdomains_en=["Ledger"],
+                    subdomains_fr=["Registre"],
+                    english_term="Smart contract",
+                    french_term="Contrat intelligent",
+                ),
+            ]
+        )
+        db.session.commit()
+        yield app
+        db.session.remove()
@@ -3,6 +3,14 @@ document.addEventListener("DOMContentLoaded", () => {
   const searchButton = document.getElementById("search-button");
   const resultsContainer = document.getElementById("results");
   const API_URL = "http://127.0.0.1:5003/api/terms/search";
+  // Set on pages exported by `flask glossary build`, which search static files
+  const INDEX_URL = resultsContainer && resultsContainer.dataset.index;
+  // Terms fetched one file each from the static index, so cap the results
+  const MAX_STATIC_RESULTS = 50;
+
+  if (!searchInput || !searchButton || !resultsContainer) {
+    return;
+  }
 
   const formater = (text) => {
     return text
@@ -14,30 +22,94 @@ document.addEventListener("DOMContentLoaded", () => {
       .replace(/\<b\>(.*?)\<\/b\>/g, '<strong>$1</strong>');
   };
 
-  const performSearch = async () => {
-    const searchTerm = searchInput.value.trim().toLowerCase();
-    if (!searchInput || searchTerm === "") {
-      return;
+  // Same normalization as `normalize` in build.py
+  const normalize = (text) =>
+    (text || "").replace(/<[^>]+>/g, "").trim().toLowerCase();
+
+  // Same file names as `shard_name` in build.py: hex of the UTF-8 bytes
+  const shardName = (key) =>
+    Array.from(new TextEncoder().encode(key), (byte) =>
+      byte.toString(16).padStart(2, "0"),
+    ).join("") + ".json";
+
+  const matches = (item, searchTerm) =>
+    normalize(item.french_term).includes(searchTerm) ||
+    normalize(item.english_term).includes(searchTerm);
+
+  const fetchJSON = async (url) => {
+    const response = await fetch(url, {
+      headers: {
+        accept: "application/json",
+      },
+    });
+
+    if (!response.ok) {
+      throw new Error("Quelque chose n'a pas marché");
     }
 
-    try {
-      const response = await fetch(`${API_URL}?term=${searchTerm}`, {
-        headers: {
-          accept: "application/json",
-        },
-      });
+    return response.json();
+  };
 
-      if (!response.ok) {
-        throw new Error("Quelque chose n'a pas marché");
-      }
+  // A missing shard means no term has that key
+  const fetchShard = (url) => fetchJSON(url).catch(() => []);
+
+  const searchApi = (searchTerm) => fetchJSON(`${API_URL}?term=${searchTerm}`);
 
-      const data = await response.json();
+  const searchStatic = async (searchTerm) => {
+    // Split by code point, as Python does in build.py
+    const chars = Array.from(searchTerm);
+    let tids;
 
-      const filteredResults = data.filter(
-        (item) =>
-          item.french_term.toLowerCase().includes(searchTerm) ||
-          item.english_term.toLowerCase().includes(searchTerm),
+    if (chars.length < 3) {
+      // Substrings of up to 3 characters have their own shard
+      tids = await fetchShard(`${INDEX_URL}search/${shardName(searchTerm)}`);
+    } else {
+      // A term containing the search term contains all of its trigrams
+      const trigrams = new Set();
+      for (let i = 0; i + 3 <= chars.length; i++) {
+        trigrams.add(chars.slice(i, i + 3).join(""));
+      }
+      const shards = await Promise.all(
+        [...trigrams].map((trigram) =>
+          fetchShard(`${INDEX_URL}search/${shardName(trigram)}`),
+        ),
       );
+      tids = shards.reduce((candidates, shard) => {
+        const shardTids = new Set(shard);
+        return candidates.filter((tid) => shardTids.has(tid));
+      });
+    }
+
+    // Trigrams only narrow the candidates, so fetch them until enough match
+    tids = [...new Set(tids)];
+    const results = [];
+    for (
+      let i = 0;
+      i < tids.length && results.length < MAX_STATIC_RESULTS;
+      i += MAX_STATIC_RESULTS
+    ) {
+      const terms = await Promise.all(
+        tids
+          .slice(i, i + MAX_STATIC_RESULTS)
+          .map((tid) => fetchJSON(`${INDEX_URL}terms/${tid}.json`)),
+      );
+      results.push(...terms.filter((item) => matches(item, searchTerm)));
+    }
+    return results.slice(0, MAX_STATIC_RESULTS);
+  };
+
+  const performSearch = async () => {
+    const searchTerm = normalize(searchInput.value);
+    if (searchTerm === "") {
+      return;
+    }
+
+    try {
+      const data = INDEX_URL
+        ? await searchStatic(searchTerm)
+        : await searchApi(searchTerm);
+
+      const filteredResults = data.filter((item) => matches(item, searchTerm));
 
       displayResults(filteredResults);
     } catch (error) {
@@ -0,0 +1,155 @@
+"""
+This file tests the `flask glossary build` command.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+from flask import Flask
+
+from app import db
+import build
+from build import (
+    JOURNAL_NAME,
+    MANIFEST_NAME,
+    TMP_DIR_NAME,
+    build_glossary,
+    shard_name,
+)
+from models import Term
+
+
+def read_json(output: str, relpath: str):
+    with open(os.path.join(output, relpath), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_rebuild_without_changes_writes_nothing(app: Flask, tmp_path) -> None:
+    output = str(tmp_path / "build")
+    first = build_glossary(app, output)
+    second = build_glossary(app, output)
+
+    assert first["terms"] == 2
+    assert first["written"] > 0
+    assert second["written"] == 0
+    assert second["removed"] == 0
+    assert second["unchanged"] == first["written"]
+
+
+def test_rebuild_rewrites_only_changed_term(app: Flask, tmp_path) -> None:
+    output = str(tmp_path / "build")
+    build_glossary(app, output)
+
+    term = db.session.get(Term, 2)
+    term.definition_en = "A program stored on a blockchain."
+    db.session.commit()
+
+    assert build_glossary(app, output)["written"] == 2
+    assert read_json(output, "terms/2.json")["definition_en"] == term.definition_en
+
+
+@pytest.mark.parametrize("full", [False, True])
+def test_deleted_term_is_removed(app: Flask, tmp_path, full: bool) -> None:
+    output = str(tmp_path / "build")
+    build_glossary(app, output)
+    smart_shard = f"search/{shard_name('sma')}"
+    assert os.path.exists(os.path.join(output, smart_shard))
+
+    db.session.delete(db.session.get(Term, 2))
+    db.session.commit()
+
+    stats = build_glossary(app, output, full=full)
+    # A normal build after the first one must not bring anything back
+    build_glossary(app, output)
+
+    assert stats["removed"] > 0
+    for relpath in ["terms/2.json", "terms/2.html", smart_shard]:
+        assert not os.path.exists(os.path.join(output, relpath))
+    assert "terms/2.json" not in read_json(output, MANIFEST_NAME)
+
+
+def test_files_of_a_crashed_build_are_tracked(
+    app: Flask, tmp_path, monkeypatch
+) -> None:
+    output = str(tmp_path / "build")
+    write_atomic = build.write_atomic
+
+    def crash_on_listing(path: str, content: bytes, tmp_dir: str) -> None:
+        if path.endswith("terms.json"):
+            raise RuntimeError("crash")
+        write_atomic(path, content, tmp_dir)
+
+    monkeypatch.setattr(build, "write_atomic", crash_on_listing)
+    with pytest.raises(RuntimeError):
+        build_glossary(app, output)
+    monkeypatch.undo()
+    assert os.path.exists(os.path.join(output, "terms/2.html"))
+    assert not os.path.exists(os.path.join(output, MANIFEST_NAME))
+
+    db.session.delete(db.session.get(Term, 2))
+    db.session.commit()
+    build_glossary(app, output)
+
+    for relpath in ["terms/2.json", "terms/2.html", JOURNAL_NAME]:
+        assert not os.path.exists(os.path.join(output, relpath))
+
+
+def test_shards_of_a_term(app: Flask, tmp_path) -> None:
+    output = str(tmp_path / "build")
+    build_glossary(app, output)
+
+    for key in ["big", "g d", "ssi", "ig", " d", "g", "é"]:
+        assert 1 in read_json(output, f"search/{shard_name(key)}")
+    assert read_json(output, f"search/{shard_name('ct')}") == [2]
+    for prefix in ["b", "bi"]:
+        entries = read_json(output, f"autocomplete/{shard_name(prefix)}")
+        assert ["<em>Big</em> data", 1, "en"] in entries
+    assert ["Données massives", 1, "fr"] in read_json(
+        output, f"autocomplete/{shard_name('do')}"
+    )
+    assert read_json(output, "facets/subdomains_en.json") == {
+        "Ledger": [2],
+        "Storage": [1],
+    }
+    assert read_json(output, "terms/1.json")["french_term"] == "Données massives"
+
+
+def test_pages(app: Flask, tmp_path) -> None:
+    output = str(tmp_path / "build")
+    build_glossary(app, output)
+
+    with open(os.path.join(output, "terms/1.html"), encoding="utf-8") as f:
+        html = f.read()
+    assert "GloTechT | Big data - Données massives" in html
+    assert "<strong>large</strong>" in html
+    for relpath in ["index.html", "contact/index.html", "404.html", "css/output.css"]:
+        assert os.path.exists(os.path.join(output, relpath))
+    with open(os.path.join(output, "glossary/index.html"), encoding="utf-8") as f:
+        assert 'data-index="/"' in f.read()
+
+
+def test_leftover_temporary_files_are_removed(app: Flask, tmp_path) -> None:
+    output = str(tmp_path / "build")
+    build_glossary(app, output)
+    leftover = os.path.join(output, TMP_DIR_NAME, "tmpabc123")
+    unrelated = os.path.join(output, "terms", "notes.tmp")
+    os.makedirs(os.path.dirname(leftover), exist_ok=True)
+    for path in [leftover, unrelated]:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{")
+
+    build_glossary(app, output)
+
+    assert not os.path.exists(leftover)
+    assert os.path.exists(unrelated)
+
+
+def test_build_command(app: Flask, tmp_path) -> None:
+    output = str(tmp_path / "build")
+    result = app.test_cli_runner().invoke(args=["glossary", "build", "-o", output])
+
+    assert result.exit_code == 0, result.output
+    assert "Built 2 terms" in result.output